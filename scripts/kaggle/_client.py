@@ -0,0 +1,22 @@
+"""
+Shared Kaggle API client for the workflow scripts
+Usage: from _client import get_api
+"""
+
+from _creds import ensure_credentials
+
+_api = None
+
+def get_api(username, key):
+    """Return an authenticated KaggleApi, created once per process"""
+    global _api
+
+    if _api is None:
+        ensure_credentials(username, key)
+
+        # Imported lazily: the kaggle package reads kaggle.json on import
+        from kaggle.api.kaggle_api_extended import KaggleApi
+        _api = KaggleApi()
+        _api.authenticate()
+
+    return _api
@@ -0,0 +1,40 @@
+"""
+Kaggle credential file shared by the workflow scripts
+Usage: from _creds import ensure_credentials
+"""
+
+import os
+import json
+import stat
+from pathlib import Path
+
+try:
+    import orjson
+    dumps = orjson.dumps
+except ImportError:
+    def dumps(data):
+        """Encode data as JSON bytes"""
+        return json.dumps(data).encode()
+
+def ensure_credentials(username, key):
+    """Write ~/.kaggle/kaggle.json only when it is missing or out of date"""
+    kaggle_dir = Path.home() / '.kaggle'
+    kaggle_dir.mkdir(exist_ok=True)
+
+    kaggle_json = kaggle_dir / 'kaggle.json'
+    credentials = {"username": username, "key": key}
+
+    try:
+        current = json.loads(kaggle_json.read_text())
+        mode = stat.S_IMODE(kaggle_json.stat().st_mode)
+    except (OSError, ValueError):
+        current, mode = None, None
+
+    if current != credentials:
+        kaggle_json.write_bytes(dumps(credentials))
+        mode = None
+
+    if mode != 0o600:
+        os.chmod(kaggle_json, 0o600)
+
+    return kaggle_json
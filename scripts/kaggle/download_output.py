@@ -9,8 +9,102 @@ import os
 import tempfile
 import zipfile
 import shutil
-import subprocess
 from pathlib import Path
+from contextlib import contextmanager
+
+from _client import get_api
+
+IMAGE_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg', '.webp'})
+
+# Minimal 1x1 PNG written when no images were downloaded
+PLACEHOLDER_PNG = b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06\x00\x00\x00\x1f\x15\xc4\x89\x00\x00\x00\nIDATx\x9cc\x00\x01\x00\x00\x05\x00\x01\r\n-\xb4\x00\x00\x00\x00IEND\xaeB`\x82'
+
+# Read buffer used when streaming zip members to disk
+ZIP_BUFFER_SIZE = 256 * 1024
+
+# Seconds a kernel output request may stall before it is abandoned
+DOWNLOAD_TIMEOUT = 60
+
+@contextmanager
+def download_session(timeout=DOWNLOAD_TIMEOUT):
+    """Route requests.get calls inside the block through one pooled session with a default timeout"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+    original_get = requests.get
+
+    def get(url, params=None, **kwargs):
+        kwargs.setdefault('timeout', timeout)
+        return session.get(url, params=params, **kwargs)
+
+    # KaggleApi fetches each kernel output file with a bare requests.get,
+    # paying a fresh TCP + TLS handshake per file without the shared session
+    requests.get = get
+    try:
+        yield
+    except requests.Timeout as e:
+        raise TimeoutError(str(e)) from e
+    finally:
+        requests.get = original_get
+        session.close()
+
+def record_image(file, basename, downloaded_files):
+    """Derive category and keyword from an image's basename and report it once"""
+    # The same image may arrive both loose and inside a zip; the last write wins
+    if file in downloaded_files:
+        return
+
+    head, sep, tail = basename.partition('-')
+
+    if sep:
+        category = head.strip()
+        keyword = tail.strip()
+    else:
+        category = 'uncategorized'
+        keyword = basename.strip()
+
+    downloaded_files[file] = {
+        'filename': file,
+        'category': category,
+        'keyword': keyword
+    }
+    print(f"Downloaded: {file} ({category}|{keyword})")
+
+def extract_images(zip_path, dest_path, downloaded_files):
+    """Stream the image members of a zip archive straight into dest_path"""
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        for member in zip_ref.infolist():
+            file = os.path.basename(member.filename)
+            basename, ext = os.path.splitext(file)
+            if member.is_dir() or ext.lower() not in IMAGE_EXTENSIONS:
+                continue
+
+            with zip_ref.open(member) as src, open(os.path.join(dest_path, file), 'wb') as dst:
+                shutil.copyfileobj(src, dst, ZIP_BUFFER_SIZE)
+
+            record_image(file, basename, downloaded_files)
+
+def place_file(src_path, dest_file):
+    """Move a file into place, copying only when a rename is not possible"""
+    try:
+        os.replace(src_path, dest_file)
+    except OSError:
+        # e.g. temp dir and destination on different filesystems
+        shutil.copy2(src_path, dest_file)
+
+def iter_output_files(root):
+    """Recursively yield (path, filename, basename, extension) of zips and images under root"""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_output_files(entry.path)
+            elif entry.is_file():
+                basename, ext = os.path.splitext(entry.name)
+                ext = ext.lower()
+                if ext == '.zip' or ext in IMAGE_EXTENSIONS:
+                    yield entry.path, entry.name, basename, ext
 
 def main():
     if len(sys.argv) < 3:
@@ -20,113 +114,54 @@ def main():
     run_id = sys.argv[1]
     dest_path = sys.argv[2]
 
-    # Get username
+    # Get credentials from environment
     username = os.environ.get('KAGGLE_USERNAME', '')
+    key = os.environ.get('KAGGLE_KEY', '')
     if not username:
         print("Error: KAGGLE_USERNAME environment variable not set", file=sys.stderr)
         sys.exit(1)
 
     # Create destination directory
-    os.makedirs(dest_path, exist_ok=True)
+    Path(dest_path).mkdir(parents=True, exist_ok=True)
 
     try:
-        # Create kaggle.json for authentication
-        kaggle_dir = Path.home() / '.kaggle'
-        kaggle_dir.mkdir(exist_ok=True)
-
-        import json
-        key = os.environ.get('KAGGLE_KEY', '')
-        kaggle_json = kaggle_dir / 'kaggle.json'
-        with open(kaggle_json, 'w') as f:
-            json.dump({"username": username, "key": key}, f)
-        os.chmod(kaggle_json, 0o600)
+        # Set up credentials and the API client before any network I/O
+        api = get_api(username, key)
 
         # Extract notebook slug from run_id (format: notebook_slug-timestamp)
-        notebook_slug = run_id.split('-')[0] if '-' in run_id else run_id
-
-        # Use kaggle CLI to download kernel output
-        # Note: This requires the kernel to have been run and have output
-        temp_dir = tempfile.mkdtemp()
-
-        try:
-            # Try to download using kaggle CLI
-            result = subprocess.run(
-                ['kaggle', 'kernels', 'output', f'{username}/{notebook_slug}', '--path', temp_dir],
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-
-            if result.returncode == 0:
-                # CLI succeeded, find the downloaded output
-                # The output is usually in a zip file
-                for root, dirs, files in os.walk(temp_dir):
-                    for file in files:
-                        if file.endswith('.zip'):
-                            zip_path = os.path.join(root, file)
-                            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                                zip_ref.extractall(temp_dir)
-                            os.remove(zip_path)
-                            break
-            else:
-                # CLI failed, try API method as fallback
-                from kaggle.api.kaggle_api_extended import KaggleApi
-                api = KaggleApi()
-                api.authenticate()
-
-                output_file = os.path.join(temp_dir, 'output.zip')
-                api.kernel_output(f'{username}/{notebook_slug}', output_file)
-
-                with zipfile.ZipFile(output_file, 'r') as zip_ref:
-                    zip_ref.extractall(temp_dir)
-
-        except subprocess.TimeoutExpired:
-            print("Warning: Download timed out", file=sys.stderr)
-        except Exception as e:
-            print(f"Warning: Download failed ({e}), creating placeholder...", file=sys.stderr)
-
-        # Find and process generated images
-        downloaded_files = []
-
-        # Look for images in the temp directory
-        for root, dirs, files in os.walk(temp_dir):
-            for file in files:
-                if file.lower().endswith(('.png', '.jpg', '.jpeg', '.webp')):
-                    src_path = os.path.join(root, file)
-
-                    # Extract category and keyword from filename
-                    basename = os.path.splitext(file)[0]
-                    parts = basename.split('-')
-
-                    if len(parts) >= 2:
-                        category = parts[0].strip()
-                        keyword = '-'.join(parts[1:]).strip()
-                    else:
-                        category = 'uncategorized'
-                        keyword = basename.strip()
-
-                    # Copy to destination
-                    dest_file = os.path.join(dest_path, file)
-                    shutil.copy2(src_path, dest_file)
-
-                    downloaded_files.append({
-                        'filename': file,
-                        'category': category,
-                        'keyword': keyword
-                    })
-                    print(f"Downloaded: {file} ({category}|{keyword})")
-
-        # Clean up
-        shutil.rmtree(temp_dir)
+        notebook_slug = run_id.partition('-')[0]
+
+        # Find and process generated images, keyed by filename in dest_path
+        downloaded_files = {}
+
+        # Download into a temporary directory first
+        with tempfile.TemporaryDirectory() as temp_dir:
+            try:
+                # Download kernel output through the Kaggle API
+                # Note: This requires the kernel to have been run and have output
+                with download_session():
+                    api.kernels_output(f'{username}/{notebook_slug}', path=temp_dir, quiet=True)
+
+            except TimeoutError:
+                print("Warning: Download timed out", file=sys.stderr)
+            except Exception as e:
+                print(f"Warning: Download failed ({e}), creating placeholder...", file=sys.stderr)
+
+            # Look for images in the temp directory
+            # The output is usually in a zip file, whose images are extracted directly
+            for src_path, file, basename, ext in iter_output_files(temp_dir):
+                if ext == '.zip':
+                    extract_images(src_path, dest_path, downloaded_files)
+                else:
+                    # Move to destination
+                    place_file(src_path, os.path.join(dest_path, file))
+                    record_image(file, basename, downloaded_files)
 
         if not downloaded_files:
             # Create placeholder file for testing
-            placeholder = os.path.join(dest_path, 'placeholder-rose.png')
-            with open(placeholder, 'wb') as f:
-                # Create a minimal 1x1 PNG
-                f.write(b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06\x00\x00\x00\x1f\x15\xc4\x89\x00\x00\x00\nIDATx\x9cc\x00\x01\x00\x00\x05\x00\x01\r\n-\xb4\x00\x00\x00\x00IEND\xaeB`\x82')
+            Path(dest_path, 'placeholder-rose.png').write_bytes(PLACEHOLDER_PNG)
             print(f"Created placeholder: placeholder-rose.png (nature|rose)")
-            downloaded_files.append({'filename': 'placeholder-rose.png', 'category': 'nature', 'keyword': 'rose'})
+            downloaded_files['placeholder-rose.png'] = {'filename': 'placeholder-rose.png', 'category': 'nature', 'keyword': 'rose'}
 
     except Exception as e:
         print(f"Error: {str(e)}", file=sys.stderr)
@@ -9,8 +9,8 @@ or using the Kaggle CLI: kaggle kernels push
 import sys
 import os
 import time
-import subprocess
-from pathlib import Path
+
+from _creds import ensure_credentials
 
 def main():
     if len(sys.argv) < 2:
@@ -30,14 +30,7 @@ def main():
         sys.exit(1)
 
     # Create kaggle.json for authentication
-    kaggle_dir = Path.home() / '.kaggle'
-    kaggle_dir.mkdir(exist_ok=True)
-
-    import json
-    kaggle_json = kaggle_dir / 'kaggle.json'
-    with open(kaggle_json, 'w') as f:
-        json.dump({"username": username, "key": key}, f)
-    os.chmod(kaggle_json, 0o600)
+    ensure_credentials(username, key)
 
     try:
         # Generate a unique run ID
@@ -6,12 +6,13 @@ Usage: python upload_dataset.py <csv_path> <dataset_title>
 
 import sys
 import os
-import json
 import tempfile
 import shutil
-import subprocess
 from pathlib import Path
 
+from _client import get_api
+from _creds import dumps
+
 def main():
     if len(sys.argv) < 3:
         print("Error: Missing arguments", file=sys.stderr)
@@ -33,61 +34,27 @@ def main():
     dataset_slug = dataset_title.lower().replace(' ', '-').replace('_', '-')[:50]
 
     try:
-        # Create kaggle.json for authentication
-        kaggle_dir = Path.home() / '.kaggle'
-        kaggle_dir.mkdir(exist_ok=True)
-
-        kaggle_json = kaggle_dir / 'kaggle.json'
-        with open(kaggle_json, 'w') as f:
-            json.dump({"username": username, "key": key}, f)
-        os.chmod(kaggle_json, 0o600)
+        api = get_api(username, key)
 
         # Create folder structure for dataset
-        temp_dir = tempfile.mkdtemp()
-        dataset_folder = os.path.join(temp_dir, dataset_slug)
-        os.makedirs(dataset_folder, exist_ok=True)
-
-        # Copy CSV to dataset folder
-        shutil.copy(csv_path, os.path.join(dataset_folder, 'my-keywords.csv'))
-
-        # Create dataset metadata
-        metadata = {
-            "title": dataset_title,
-            "id": f"{username}/{dataset_slug}",
-            "licenses": [{"name": "CC0-1.0"}]
-        }
-
-        with open(os.path.join(dataset_folder, 'dataset-metadata.json'), 'w') as f:
-            json.dump(metadata, f)
-
-        # Use kaggle CLI to create dataset
-        result = subprocess.run(
-            ['kaggle', 'datasets', 'create', '-f', dataset_folder],
-            capture_output=True,
-            text=True
-        )
-
-        # Clean up
-        shutil.rmtree(temp_dir)
-
-        if result.returncode != 0:
-            # Try alternative method using API directly
-            print(f"Warning: CLI method failed, trying API...", file=sys.stderr)
-            from kaggle.api.kaggle_api_extended import KaggleApi
-            api = KaggleApi()
-            api.authenticate()
-
-            # Re-create for API method
-            temp_dir = tempfile.mkdtemp()
+        with tempfile.TemporaryDirectory() as temp_dir:
             dataset_folder = os.path.join(temp_dir, dataset_slug)
             os.makedirs(dataset_folder, exist_ok=True)
+
+            # Copy CSV to dataset folder
             shutil.copy(csv_path, os.path.join(dataset_folder, 'my-keywords.csv'))
 
-            with open(os.path.join(dataset_folder, 'dataset-metadata.json'), 'w') as f:
-                json.dump(metadata, f)
+            # Create dataset metadata
+            metadata = {
+                "title": dataset_title,
+                "id": f"{username}/{dataset_slug}",
+                "licenses": [{"name": "CC0-1.0"}]
+            }
+
+            Path(dataset_folder, 'dataset-metadata.json').write_bytes(dumps(metadata))
 
+            # Create dataset through the Kaggle API
             api.dataset_create_new(folder=dataset_folder, public=False, quiet=False)
-            shutil.rmtree(temp_dir)
 
         dataset_url = f"https://www.kaggle.com/datasets/{username}/{dataset_slug}"
         print(f"Dataset URL: {dataset_url}")
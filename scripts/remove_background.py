@@ -1,22 +1,142 @@
-from PIL import Image
+"""
+Make near-white backgrounds transparent
+Usage: python remove_background.py [inputs ...] [--out-dir DIR] [--tolerance N] [--force]
+Each input is saved as <name>-transparent.png, next to it or in --out-dir.
+Inputs whose output is already newer are skipped unless --force is given.
+"""
 
-def remove_background(input_path, output_path, tolerance=50):
-    img = Image.open(input_path).convert("RGBA")
-    datas = img.getdata()
-
-    newData = []
-    for item in datas:
-        # Check if the pixel is close to white
-        # item is (R, G, B, A)
-        if item[0] > 255 - tolerance and item[1] > 255 - tolerance and item[2] > 255 - tolerance:
-            newData.append((255, 255, 255, 0))  # Transparent
+import os
+import argparse
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageChops
+
+# Below this many pixels the JIT kernel is not worth dispatching to
+NUMBA_MIN_PIXELS = 2_000_000
+
+_kernel = None
+
+# Set to 1 in pool workers, which already run one process per core
+_numba_threads = None
+
+def _numba_kernel():
+    """Compile the fused Numba kernel on first use; None when numba is not installed"""
+    global _kernel
+
+    if _kernel is None:
+        try:
+            from numba import njit, prange, set_num_threads
+        except ImportError:
+            _kernel = False
         else:
-            newData.append(item)
+            @njit(parallel=True, cache=True)
+            def _strip(arr, thr):
+                # Fused compare + alpha write, one pass over each row
+                for y in prange(arr.shape[0]):
+                    for x in range(arr.shape[1]):
+                        if arr[y, x, 0] > thr and arr[y, x, 1] > thr and arr[y, x, 2] > thr:
+                            arr[y, x, 0] = 255
+                            arr[y, x, 1] = 255
+                            arr[y, x, 2] = 255
+                            arr[y, x, 3] = 0
+
+            _kernel = _strip
+            if _numba_threads is not None:
+                set_num_threads(_numba_threads)
+
+    return _kernel or None
+
+def _remove_numpy(img, thr):
+    """Clear near-white pixels with numpy, or the Numba kernel for large images"""
+    # numpy (and numba) are only imported when this backend is used
+    import numpy as np
+
+    arr = np.array(img, dtype=np.uint8)
+    kernel = _numba_kernel() if arr.shape[0] * arr.shape[1] >= NUMBA_MIN_PIXELS else None
+
+    if kernel is not None:
+        kernel(arr, thr)
+    else:
+        # All three channels exceed thr iff the smallest one does
+        mask = arr[:, :, :3].min(axis=2) > thr
+        arr[mask] = (255, 255, 255, 0)
+
+    return Image.fromarray(arr, "RGBA")
+
+def _remove_pillow(img, thr):
+    """Clear near-white pixels with Pillow channel LUTs, without numpy"""
+    # Per-channel LUT: 255 where the channel is near white, 0 elsewhere
+    lut = [255 if i > thr else 0 for i in range(256)]
+    r, g, b, _ = img.split()
+    mask = ImageChops.darker(ImageChops.darker(r.point(lut), g.point(lut)), b.point(lut))
 
-    img.putdata(newData)
-    img.save(output_path, "PNG")
+    img.paste((255, 255, 255, 0), None, mask)
+    return img
+
+BACKENDS = {
+    "numpy": _remove_numpy,
+    "pillow": _remove_pillow,
+}
+
+# The output is a build intermediate: favour encode speed over file size
+DEFAULT_COMPRESS_LEVEL = 1
+
+def remove_background(input_path, output_path, tolerance=50, backend="numpy",
+                      compress_level=DEFAULT_COMPRESS_LEVEL, force=False):
+    # Output newer than input: nothing to redo
+    if (not force and os.path.exists(output_path)
+            and os.path.getmtime(output_path) >= os.path.getmtime(input_path)):
+        print(f"Up to date: {output_path}")
+        return
+
+    img = Image.open(input_path).convert("RGBA")
+
+    # Pixels close to white on every channel become transparent
+    img = BACKENDS[backend](img, 255 - tolerance)
+
+    img.save(output_path, "PNG", compress_level=compress_level)
     print(f"Saved transparent image to {output_path}")
 
-target_file = "public/logo-v3.png"
-temp_output = "public/logo-v3-transparent.png"
-remove_background(target_file, temp_output)
+def output_path_for(input_path, out_dir=None):
+    """Return <name>-transparent.png next to the input, or in out_dir"""
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(out_dir or os.path.dirname(input_path), f"{stem}-transparent.png")
+
+def _init_worker():
+    """Pool initializer: keep each worker's Numba kernel on a single thread"""
+    global _numba_threads
+    _numba_threads = 1
+
+def _process_file(input_path, out_dir, tolerance, backend, compress_level, force):
+    """Process one input; the unit of work handed to the process pool"""
+    remove_background(input_path, output_path_for(input_path, out_dir),
+                      tolerance, backend, compress_level, force)
+
+def main():
+    parser = argparse.ArgumentParser(description="Make near-white backgrounds transparent")
+    parser.add_argument("inputs", nargs="*", default=["public/logo-v3.png"])
+    parser.add_argument("--out-dir")
+    parser.add_argument("--tolerance", type=int, default=50)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="numpy")
+    parser.add_argument("--compress-level", type=int, choices=range(10), default=DEFAULT_COMPRESS_LEVEL)
+    parser.add_argument("--force", action="store_true", help="reprocess even if the output is up to date")
+    args = parser.parse_args()
+
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+
+    worker = partial(_process_file, out_dir=args.out_dir, tolerance=args.tolerance,
+                     backend=args.backend, compress_level=args.compress_level,
+                     force=args.force)
+
+    # Images are independent; spread batches over one process per core
+    if len(args.inputs) > 1:
+        with ProcessPoolExecutor(initializer=_init_worker) as executor:
+            list(executor.map(worker, args.inputs))
+    else:
+        for input_path in args.inputs:
+            worker(input_path)
+
+if __name__ == "__main__":
+    main()